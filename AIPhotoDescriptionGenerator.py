@@ -15,19 +15,27 @@ Version: 3.27
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
+import sys
 import sqlite3
 import base64
+import hashlib
 from io import BytesIO
-from PIL import Image, ImageTk
+from PIL import Image, ImageOps, ImageTk
 import threading
+import asyncio
 import queue
 import json
 import re
 import configparser
 from datetime import datetime
 import shutil
-from pathlib import Path
 import traceback
+from collections import defaultdict
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+if sys.platform == "win32" and sys.version_info < (3, 12):
+    import ctypes
 
 # Optional library imports
 try:
@@ -38,11 +46,61 @@ try:
 except ImportError: anthropic = None
 try:
     import google.generativeai as genai
+    from google.api_core import exceptions as google_exceptions, retry as google_retry
 except ImportError: genai = None
 try:
-    import cv2
-    import numpy as np
-except ImportError: cv2, np = None, None
+    import httpx
+except ImportError: httpx = None
+try:
+    import orjson
+except ImportError: orjson = None
+try:
+    import pybase64
+except ImportError: pybase64 = None
+try:
+    import pyvips
+except (ImportError, OSError): pyvips = None # OSError: binding installed but libvips missing
+
+# orjson parses LLM replies several times faster; its JSONDecodeError subclasses json.JSONDecodeError
+json_loads = orjson.loads if orjson else json.loads
+# pybase64 runs SIMD (SSSE3/AVX2/NEON) kernels, several times faster than the stdlib on multi-MB payloads; same API and output
+b64encode, b64decode = (pybase64.b64encode, pybase64.b64decode) if pybase64 else (base64.b64encode, base64.b64decode)
+
+# Default and upper bound of the number of LLM requests kept in flight during batch processing (set in the UI)
+LLM_CONCURRENCY, LLM_MAX_CONCURRENCY = 8, 32
+# Retries per OpenAI/Anthropic request on 429s and transient server errors; the SDKs back off exponentially with jitter and honour Retry-After
+LLM_MAX_RETRIES = 5
+# Same policy for Gemini, whose SDK only retries when given a google.api_core Retry (deadline-based rather than counted)
+GEMINI_RETRY = google_retry.Retry(predicate=google_retry.if_exception_type(google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable, google_exceptions.InternalServerError, google_exceptions.DeadlineExceeded),
+                                  initial=1.0, maximum=30.0, multiplier=2.0, timeout=120.0) if genai else None
+# Keep-alive pool reused by all OpenAI/Anthropic requests, so TLS handshakes are not repeated per image
+HTTP_POOL_LIMITS = {'max_connections': 64, 'max_keepalive_connections': 32}; HTTP_TIMEOUT = 60.0
+# Applied once when the shared DB connection is opened: WAL avoids an fsync per commit and lets readers run alongside the writer
+SQLITE_PRAGMAS = "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY; PRAGMA cache_size=-64000; PRAGMA mmap_size=268435456;"
+# Seconds Exit waits for a worker to release the DB before closing without the final flush (sqlite's busy timeout is 5 s)
+EXIT_DB_LOCK_TIMEOUT = 10
+# Batch mode commits descriptions in groups of this size instead of one transaction per image
+DB_WRITE_BATCH_SIZE = 50
+# Bounding box of images sent to the LLMs: Anthropic downscales anything larger server-side, and OpenAI (768 px short side)
+# and Gemini (768 px tiles) use even less, so bigger payloads only add encode and upload time
+PAYLOAD_MAX_SIZE = (1568, 1568)
+# JPEGs/PNGs that already fit the payload box are sent as-is up to this size (~4 MB once base64-encoded)
+ORIGINAL_PAYLOAD_MAX_BYTES = 3 * 1024 * 1024; ORIGINAL_PAYLOAD_TYPES = {'JPEG': ('image/jpeg', ('RGB', 'L')), 'PNG': ('image/png', ('RGB', 'RGBA', 'L'))}
+# Maximum number of ids per "IN (...)" query, below SQLite's historical 999 bound-parameter limit
+SQL_IN_CHUNK_SIZE = 500
+# Lines kept in the log pane; older lines are dropped so long runs do not grow the Text widget without bound
+LOG_MAX_LINES = 10000
+# Update-queue polling interval (ms): short while workers are posting updates, longer when idle
+QUEUE_POLL_BUSY_MS, QUEUE_POLL_IDLE_MS = 50, 250
+# Bounding box of the image preview in the description dialogs
+PREVIEW_SIZE = (400, 400)
+# Copies run concurrently while renaming; the work is I/O-bound, so more threads than cores
+RENAME_COPY_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+# Renaming reports progress at most this many times per run (every 0.5%) instead of once per file
+RENAME_PROGRESS_STEPS = 200
+SAVE_DESCRIPTION_SQL = "UPDATE images SET ai_short_description=?, ai_long_description=?, ai_processed_date=?, ai_llm_used=?, ai_language=?, ai_content_hash=? WHERE id=?"
+# Description of a byte-identical image made by the same LLM in the same language; lets batch mode skip the request
+CACHED_DESCRIPTION_SQL = "SELECT ai_short_description, ai_long_description FROM images WHERE ai_content_hash=? AND ai_llm_used=? AND ai_language=? AND ai_short_description IS NOT NULL AND ai_short_description != '' LIMIT 1"
 
 # --- Internationalization (i18n) ---
 LANGUAGES = {
@@ -50,11 +108,12 @@ LANGUAGES = {
         'version': "v3.27",
         'window_title': "AI Photo Description Generator",
         'db_frame_title': "Database", 'db_path_label': "DB Path:", 'browse_button': "Browse...",
-        'settings_frame_title': "Settings", 'llm_label': "LLM:", 'filename_language_label': "Description Language:",
+        'settings_frame_title': "Settings", 'llm_label': "LLM:", 'filename_language_label': "Description Language:", 'llm_concurrency_label': "Parallel requests (batch):",
         'process_frame_title': "Process", 'process_mode_if_empty': "Only photos without description", 'process_mode_all': "All photos",
         'interaction_frame_title': "Interaction Mode", 'interaction_batch': "Batch processing (auto-save)", 'interaction_interactive': "One by one (interactive)",
         'control_frame_title': "Controls", 'start_button': "Start Processing", 'stop_button': "Stop", 'rename_button': "Rename Files", 'exit_button': "Exit",
         'rename_frame_title': "File Renaming", 'rename_dest_dir_label': "Directory for new files:", 'start_rename_button': "Start Renaming",
+        'rename_use_hardlinks': "Create hard links instead of copies (instant, same disk only)",
         'log_frame_title': "  Processing Log", 
         'copy_log_button': "📋", 'log_copied': "Log copied to clipboard.",
         'select_db_warning_title': "Warning", 'select_db_warning_msg': "Please select a working database first.",
@@ -68,9 +127,11 @@ LANGUAGES = {
         'keys_file_not_found': "'keys-ai.ini' file not found. LLM services will be unavailable.",
         'client_not_initialized': "ERROR: {llm} client is not initialized. Check 'keys-ai.ini' or library installation.",
         'sending_request_to': "Sending request to {llm} for {filename}...", 'api_error': "API Error {llm}: {e}",
-        'image_encode_failed': "Failed to encode image: {filename}", 'propose_rename_dir': "Proposed directory for renaming: {dest_dir}",
+        'image_encode_failed': "Failed to encode image: {filename}", 'image_processing_error': "Error processing {filename}: {e}",
+        'reused_description_for': "Identical image already described, reusing its description for {filename}",
+        'propose_rename_dir': "Proposed directory for renaming: {dest_dir}",
         'propose_rename_dir_error': "Error determining default path: {e}", 'renaming_started': "Starting renaming...",
-        'found_for_renaming': "Found for renaming: {total} images.", 'copied_file': "Copied: {original} -> {new}",
+        'found_for_renaming': "Found for renaming: {total} images.", 'copied_file': "Copied: {original} -> {new}", 'linked_file': "Linked: {original} -> {new}",
         'copy_error': "Error copying file {original}: {e}", 'renaming_finished': "Renaming finished.",
         'critical_error_renaming_thread': "Critical error in renaming thread: {e}\n{traceback}",
         'edit_dialog_title': "Edit AI Description", 'interactive_dialog_title': "Review Existing Description",
@@ -83,11 +144,12 @@ LANGUAGES = {
         'version': "v3.27",
         'window_title': "Генератор описаний фото",
         'db_frame_title': "База данных", 'db_path_label': "Путь к БД:", 'browse_button': "Обзор...",
-        'settings_frame_title': "Настройки", 'llm_label': "LLM:", 'filename_language_label': "Язык описаний:",
+        'settings_frame_title': "Настройки", 'llm_label': "LLM:", 'filename_language_label': "Язык описаний:", 'llm_concurrency_label': "Параллельных запросов (пакет):",
         'process_frame_title': "Обрабатывать", 'process_mode_if_empty': "Только фото без описания", 'process_mode_all': "Все фото",
         'interaction_frame_title': "Режим взаимодействия", 'interaction_batch': "Пакетная обработка (автосохранение)", 'interaction_interactive': "По одному (интерактивно)",
         'control_frame_title': "Управление", 'start_button': "Начать обработку", 'stop_button': "Остановить", 'rename_button': "Переименовать файлы", 'exit_button': "Выход",
         'rename_frame_title': "Переименование файлов", 'rename_dest_dir_label': "Директория для новых файлов:", 'start_rename_button': "Начать переименование",
+        'rename_use_hardlinks': "Создавать жёсткие ссылки вместо копий (мгновенно, только на том же диске)",
         'log_frame_title': "  Лог обработки", 
         'copy_log_button': "📋", 'log_copied': "Лог скопирован в буфер обмена.",
         'select_db_warning_title': "Предупреждение", 'select_db_warning_msg': "Сначала выберите рабочую базу данных.",
@@ -101,9 +163,11 @@ LANGUAGES = {
         'keys_file_not_found': "Файл 'keys-ai.ini' не найден. LLM сервисы будут недоступны.",
         'client_not_initialized': "ОШИБКА: Клиент {llm} не инициализирован. Проверьте 'keys-ai.ini' или установку библиотеки.",
         'sending_request_to': "Отправка запроса к {llm} для {filename}...", 'api_error': "Ошибка API {llm}: {e}",
-        'image_encode_failed': "Не удалось закодировать изображение: {filename}", 'propose_rename_dir': "Предложена директория для переименования: {dest_dir}",
+        'image_encode_failed': "Не удалось закодировать изображение: {filename}", 'image_processing_error': "Ошибка обработки {filename}: {e}",
+        'reused_description_for': "Идентичное изображение уже описано, его описание использовано для {filename}",
+        'propose_rename_dir': "Предложена директория для переименования: {dest_dir}",
         'propose_rename_dir_error': "Ошибка при определении пути по умолчанию: {e}", 'renaming_started': "Начало переименования...",
-        'found_for_renaming': "Найдено для переименования: {total} изображений.", 'copied_file': "Скопировано: {original} -> {new}",
+        'found_for_renaming': "Найдено для переименования: {total} изображений.", 'copied_file': "Скопировано: {original} -> {new}", 'linked_file': "Создана ссылка: {original} -> {new}",
         'copy_error': "Ошибка копирования файла {original}: {e}", 'renaming_finished': "Переименование завершено.",
         'critical_error_renaming_thread': "Критическая ошибка в потоке переименования: {e}\n{traceback}",
         'edit_dialog_title': "Редактирование описания от LLM", 'interactive_dialog_title': "Просмотр существующего описания",
@@ -116,32 +180,146 @@ LANGUAGES = {
 
 # --- Helper Functions ---
 def correct_image_orientation(img: Image.Image) -> Image.Image:
+    """Applies all 8 EXIF orientations (mirrored ones included) with Pillow's transpose kernels; upright images are returned as-is."""
     try:
-        exif = img.getexif(); orientation_tag = 274
-        if orientation_tag in exif:
-            orientation = exif[orientation_tag]
-            if orientation == 3: img = img.rotate(180, expand=True)
-            elif orientation == 6: img = img.rotate(270, expand=True)
-            elif orientation == 8: img = img.rotate(90, expand=True)
-    except (AttributeError, KeyError, IndexError): pass
+        if img.getexif().get(274, 1) == 1: return img # exif_transpose would still return a copy
+        return ImageOps.exif_transpose(img)
+    except Exception: return img
+
+def open_image_scaled(image_path, size):
+    """Opens an image; JPEGs are decoded by libjpeg at the smallest DCT scale (1/2..1/8) still twice the final fit into `size`,
+    the quality margin thumbnail()'s own draft keeps (reducing_gap=2). Done here because rotated images are loaded before thumbnail()."""
+    img = Image.open(image_path)
+    if img.format in ('JPEG', 'MPO'):
+        scale = min(size[0] / img.width, size[1] / img.height) # Boxes are square, so EXIF rotation doesn't change the fit
+        if scale < 1: img.draft('RGB', (max(1, round(2 * scale * img.width)), max(1, round(2 * scale * img.height))))
     return img
 
-def get_image_base64(image_path, max_size=(2048, 2048)):
+def vips_thumbnail_jpeg(image_path, max_size):
+    """libvips shrink-on-load + resize + JPEG encode; streams the file and applies EXIF orientation itself."""
+    img = pyvips.Image.thumbnail(image_path, max_size[0], height=max_size[1], size='down')
+    if img.hasalpha(): img = img.flatten(background=255)
+    return img.jpegsave_buffer(strip=True) # Drops EXIF/XMP/IPTC (GPS, camera serial...) like Pillow's save does
+
+def flatten_on_white(img):
+    """Composites transparency onto white like libvips flatten(background=255); convert('RGB') would expose the colour under it, usually black."""
+    img = img.convert('RGBA'); flat = Image.new('RGB', img.size, (255, 255, 255)); flat.paste(img, mask=img.getchannel('A'))
+    return flat
+
+def get_image_base64(image_path, max_size=PAYLOAD_MAX_SIZE):
+    """Returns (media_type, base64 data). The cache, keyed by modification time, only hands the payload prefetched in interactive mode on to its request."""
+    try: mtime = os.path.getmtime(image_path)
+    except OSError as e: print(f"Error encoding image {image_path}: {e}"); return None
+    return encode_image_base64(image_path, mtime, max_size)
+
+def has_embedded_metadata(img):
+    """EXIF (GPS, camera serial, maker notes...), XMP or IPTC blocks; only a re-encode strips them before a file leaves the machine."""
+    if img.getexif() or 'xmp' in img.info or 'XML:com.adobe.xmp' in img.info: return True
+    return any(marker in ('APP1', 'APP13') for marker, _ in getattr(img, 'applist', ())) # JPEG EXIF/XMP and IPTC segments
+
+@lru_cache(maxsize=2) # The prefetched payload and the one being sent; batch mode encodes each image once and never hits it
+def encode_image_base64(image_path, mtime, max_size):
     try:
+        # Already small JPEG/PNG without metadata: skip the decode/resize/re-encode round trip.
+        # Checked on the header size, before open_image_scaled's draft() can shrink exact multiples of max_size to fit.
         with Image.open(image_path) as img:
+            media_type, modes = ORIGINAL_PAYLOAD_TYPES.get(img.format, (None, ()))
+            passthrough = (img.mode in modes and img.width <= max_size[0] and img.height <= max_size[1]
+                           and os.path.getsize(image_path) <= ORIGINAL_PAYLOAD_MAX_BYTES and not has_embedded_metadata(img))
+        if passthrough:
+            with open(image_path, 'rb') as f: return media_type, b64encode(f.read()).decode('ascii')
+        with open_image_scaled(image_path, max_size) as img:
+            if pyvips:
+                try: return 'image/jpeg', b64encode(vips_thumbnail_jpeg(image_path, max_size)).decode('ascii')
+                except pyvips.Error: pass # Formats libvips can't load still go through Pillow, which has opened the file already
             img = correct_image_orientation(img); img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info: img = flatten_on_white(img)
+            elif img.mode not in ('RGB', 'L'): img = img.convert('RGB') # JPEG cannot store palettes
             buffered = BytesIO(); img.save(buffered, format="JPEG")
-            return base64.b64encode(buffered.getvalue()).decode('utf-8')
+            return 'image/jpeg', b64encode(buffered.getbuffer()).decode('ascii') # Encodes from the buffer's memory without a getvalue() copy
     except Exception as e: print(f"Error encoding image {image_path}: {e}"); return None
 
+def file_content_hash(image_path):
+    """blake2b of the file contents, shared by identical copies of a photo wherever they live; None if unreadable."""
+    try:
+        digest = hashlib.blake2b(digest_size=20)
+        with open(image_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''): digest.update(block)
+        return digest.hexdigest()
+    except OSError: return None
+
+# Built once; str.translate maps single chars to multi-char strings ('ж' -> 'zh') in one C-level pass
+TRANSLIT_TABLE = str.maketrans({'ь':'', 'ъ':'', 'а':'a','б':'b','в':'v','г':'g','д':'d','е':'e','ё':'e', 'ж':'zh','з':'z','и':'i','й':'y','к':'k','л':'l','м':'m','н':'n', 'о':'o','п':'p','р':'r','с':'s','т':'t','у':'u','ф':'f','х':'h', 'ц':'c','ч':'ch','ш':'sh','щ':'shch','ы':'y','э':'e','ю':'yu','я':'ya'})
+
 def transliterate(name):
-    dic = {'ь':'', 'ъ':'', 'а':'a','б':'b','в':'v','г':'g','д':'d','е':'e','ё':'e', 'ж':'zh','з':'z','и':'i','й':'y','к':'k','л':'l','м':'m','н':'n', 'о':'o','п':'p','р':'r','с':'s','т':'t','у':'u','ф':'f','х':'h', 'ц':'c','ч':'ch','ш':'sh','щ':'shch','ы':'y','э':'e','ю':'yu','я':'ya'}
-    return "".join(map(lambda x: dic.get(x, x), name.lower()))
+    return name.lower().translate(TRANSLIT_TABLE)
 
+# Compiled once at import instead of going through the re module cache on every call
+INVALID_FILENAME_CHARS_RE = re.compile(r'[\\/*?:"<>|]'); WHITESPACE_RE = re.compile(r'\s+')
+SHORT_FIELD_RE = re.compile(r'["\']short["\']\s*:\s*["\'](.*?)["\']', re.DOTALL); LONG_FIELD_RE = re.compile(r'["\']long["\']\s*:\s*["\'](.*?)["\']', re.DOTALL)
+
+@lru_cache(maxsize=4096) # Burst shots and series often share one short description
 def sanitize_filename(name):
-    name = re.sub(r'[\\/*?:"<>|]', "", name); name = re.sub(r'\s+', '_', name)
+    name = INVALID_FILENAME_CHARS_RE.sub("", name); name = WHITESPACE_RE.sub('_', name)
     return name
 
+def file_suffix(path):
+    """Path(path).suffix with plain str operations, without building a Path object per renamed file."""
+    name = os.path.basename(path); dot = name.rfind('.')
+    return name[dot:] if 0 < dot < len(name) - 1 else ''
+
+def copy_file_fast(src, dst):
+    """shutil.copy2 equivalent; on Linux os.copy_file_range keeps the data in the kernel and lets Btrfs/XFS share extents (reflink)."""
+    # Before 3.12, copy2 on Windows copies through a 1 MiB readinto loop; CopyFileW copies inside the OS (server-side on network
+    # shares) and brings timestamps and attributes along. From 3.12 copy2 calls CopyFile2 itself.
+    if sys.platform == "win32" and sys.version_info < (3, 12):
+        if not ctypes.windll.kernel32.CopyFileW(src, dst, False): shutil.copy2(src, dst) # Retried so errors carry proper filenames
+        return
+    if not hasattr(os, 'copy_file_range'): shutil.copy2(src, dst); return
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if not copied: break
+                remaining -= copied
+    except OSError: remaining = None # e.g. EXDEV across filesystems on older kernels
+    # Also redone when the loop stopped short (some FUSE/overlay/ecryptfs mounts return 0 early, or the source shrank): never keep a truncated copy
+    if remaining != 0: shutil.copy2(src, dst); return
+    shutil.copystat(src, dst)
+
+def link_or_copy(src, dst):
+    """Hard-links dst to src, falling back to a metadata-preserving copy across filesystems or where links are unsupported. Returns True if linked."""
+    try: os.link(src, dst); return True
+    except OSError: copy_file_fast(src, dst); return False
+
+@lru_cache(maxsize=1024)
+def build_prompt(lang_code, person_names, dog_names):
+    """Prompt for one image; cached because photos of the same people and dogs share it (name lists are passed as tuples)."""
+    if lang_code == "ru":
+        base_prompt = ("Проанализируй это изображение и предоставь описания на русском языке.\n\n"
+                       "Ты ДОЛЖЕН ответить ТОЛЬКО JSON объектом со структурой:\n"
+                       "{\"short\": \"краткое описание на русском\", \"long\": \"подробное описание изображения на русском\"}\n\n"
+                       "Правила для краткого описания:\n- Краткое описание сцены на русском языке.\n- Используй пробелы между словами (НЕ подчеркивания).\n"
+                       "- Максимум 100 символов.\n- На правильном русском языке.\n- Это описание будет использовано как имя файла, поэтому оно должно быть лаконичным и информативным.\n\n"
+                       "Дополнительно, если на фото изображено известное место или произведение искусства, постарайся указать его название. "
+                       "Для произведений искусства, если возможно, укажи автора и место хранения (музей). "
+                       "Эту информацию кратко отрази в коротком описании и более подробно в длинном.")
+    else: # English
+        base_prompt = ("Analyze this image and provide descriptions in English.\n\n"
+                       "You MUST respond with ONLY a JSON object with the structure:\n"
+                       "{\"short\": \"short description in English\", \"long\": \"detailed description of the image in English\"}\n\n"
+                       "Rules for the short description:\n- Brief description of the scene in English.\n- Use spaces between words (NOT underscores).\n"
+                       "- Maximum 100 characters.\n- In proper English.\n- This description will be used as a filename, so it should be concise and informative.\n\n"
+                       "Additionally, if the photo depicts a famous place or a work of art, try to identify it. "
+                       "For artwork, if possible, specify the artist and its location (museum). "
+                       "Briefly include this information in the short description and provide more detail in the long one.")
+    if person_names:
+        names_str = ", ".join(person_names); base_prompt += f"\n\nЛюди на этом изображении: {names_str}\nВАЖНО: Включи эти имена в свои описания." if lang_code == "ru" else f"\n\nPeople in this image: {names_str}\nIMPORTANT: Include these names in your descriptions."
+    if dog_names:
+        dogs_str = ", ".join(dog_names); base_prompt += f"\n\nСобаки на этом изображении: {dogs_str}\nВАЖНО: Включи эти клички собак в свои описания." if lang_code == "ru" else f"\n\nDogs in this image: {dogs_str}\nIMPORTANT: Include these dog names in your descriptions."
+    return base_prompt
+
 # --- Base Dialog Class ---
 class BaseDialog(tk.Toplevel):
     def __init__(self, parent, app_context, title):
@@ -165,11 +343,8 @@ class BaseDialog(tk.Toplevel):
         
     def load_image(self, image_path, img_label):
         try:
-            if cv2 and np:
-                 img_cv = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
-                 img_rgb = cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB); img_pil = Image.fromarray(img_rgb)
-            else: img_pil = Image.open(image_path)
-            img_pil = correct_image_orientation(img_pil); img_pil.thumbnail((400, 400), Image.Resampling.LANCZOS)
+            img_pil = open_image_scaled(image_path, PREVIEW_SIZE) # Pillow opens Unicode (e.g. Cyrillic) paths on Windows too
+            img_pil = correct_image_orientation(img_pil); img_pil.thumbnail(PREVIEW_SIZE, Image.Resampling.LANCZOS)
             photo = ImageTk.PhotoImage(img_pil); img_label.config(image=photo); img_label.image = photo
         except Exception as e: img_label.config(text=self.lang['image_load_fail'].format(e=e))
 
@@ -207,11 +382,14 @@ class AIPhotoDescriptor:
         self.root = root; self.root.title("AI Photo Description Generator"); self.root.geometry("1200x900")
         self.ui_language = tk.StringVar(value="RU"); self.lang = LANGUAGES[self.ui_language.get()]
         self.db_path = tk.StringVar(); self.selected_llm = tk.StringVar(value="OpenAI"); self.selected_filename_language = tk.StringVar(value="Русский")
-        self.process_target_mode = tk.StringVar(value="if_empty"); self.interaction_mode = tk.StringVar(value="interactive")
-        self.rename_dest_dir = tk.StringVar()
+        self.process_target_mode = tk.StringVar(value="if_empty"); self.interaction_mode = tk.StringVar(value="interactive"); self.llm_concurrency = tk.IntVar(value=LLM_CONCURRENCY)
+        self.rename_dest_dir = tk.StringVar(); self.use_hardlinks = tk.BooleanVar(value=False)
         self.openai_client, self.anthropic_client, self.gemini_model = None, None, None; self.processing = False
-        self.update_queue = queue.Queue()
+        self.db_conn, self.db_conn_path, self.db_lock = None, None, threading.RLock(); self.pending_writes = []; self.schema_checked_paths = set()
+        self.db_file = "" # Plain copy of db_path, read on the Tk thread: worker threads must not touch Tk variables while holding db_lock
+        self.update_queue = queue.Queue(); self.applied_language = None
         self.init_llm_clients(); self.create_widgets(); self.process_queue(); self.update_ui_language()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_exit)
 
     def create_widgets(self):
         header_frame = ttk.Frame(self.root, padding=(10, 5, 10, 0)); header_frame.pack(fill=tk.X)
@@ -223,6 +401,15 @@ class AIPhotoDescriptor:
         main_notebook = ttk.Notebook(self.root); main_notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.process_tab = ttk.Frame(main_notebook); main_notebook.add(self.process_tab, text="  Обработка  ")
         self.create_process_tab(self.process_tab)
+        # (widget, text key) pairs relabelled by update_ui_language
+        self.i18n_widgets = [(self.version_label, 'version'), (self.db_frame, 'db_frame_title'), (self.settings_frame, 'settings_frame_title'),
+            (self.process_frame, 'process_frame_title'), (self.interaction_frame, 'interaction_frame_title'), (self.control_frame, 'control_frame_title'),
+            (self.rename_frame, 'rename_frame_title'), (self.log_container, 'log_frame_title'), (self.db_path_label, 'db_path_label'), (self.llm_label, 'llm_label'),
+            (self.filename_language_label, 'filename_language_label'), (self.llm_concurrency_label, 'llm_concurrency_label'), (self.rename_dest_dir_label, 'rename_dest_dir_label'),
+            (self.browse_db_button, 'browse_button'), (self.process_button, 'start_button'), (self.stop_button, 'stop_button'), (self.toggle_rename_button, 'rename_button'),
+            (self.exit_button, 'exit_button'), (self.copy_log_button, 'copy_log_button'), (self.browse_rename_button, 'browse_button'), (self.start_rename_button, 'start_rename_button'),
+            (self.hardlinks_check, 'rename_use_hardlinks'), (self.process_rb1, 'process_mode_if_empty'), (self.process_rb2, 'process_mode_all'),
+            (self.interact_rb1, 'interaction_batch'), (self.interact_rb2, 'interaction_interactive')]
 
     def create_process_tab(self, parent):
         parent.columnconfigure(0, weight=1)
@@ -244,6 +431,9 @@ class AIPhotoDescriptor:
         lang_frame = ttk.Frame(settings_left); lang_frame.pack(anchor="w")
         self.filename_language_label = ttk.Label(lang_frame); self.filename_language_label.pack(anchor="w")
         ttk.Combobox(lang_frame, textvariable=self.selected_filename_language, values=["Русский", "English"], state="readonly").pack(anchor="w")
+        concurrency_frame = ttk.Frame(settings_left); concurrency_frame.pack(anchor="w", pady=(10, 0))
+        self.llm_concurrency_label = ttk.Label(concurrency_frame); self.llm_concurrency_label.pack(anchor="w")
+        ttk.Spinbox(concurrency_frame, from_=1, to=LLM_MAX_CONCURRENCY, textvariable=self.llm_concurrency, state="readonly", width=5).pack(anchor="w") # Read-only: always holds a valid number
         self.process_frame = ttk.LabelFrame(settings_right, padding=10); self.process_frame.pack(anchor="w", fill=tk.X)
         self.process_rb1 = ttk.Radiobutton(self.process_frame, variable=self.process_target_mode, value="if_empty"); self.process_rb1.pack(anchor="w")
         self.process_rb2 = ttk.Radiobutton(self.process_frame, variable=self.process_target_mode, value="all"); self.process_rb2.pack(anchor="w")
@@ -255,7 +445,7 @@ class AIPhotoDescriptor:
         self.process_button = ttk.Button(self.control_frame, command=self.start_processing, style="Accent.TButton"); self.process_button.pack(side=tk.LEFT, padx=5)
         self.stop_button = ttk.Button(self.control_frame, command=self.stop_processing, state=tk.DISABLED); self.stop_button.pack(side=tk.LEFT, padx=5)
         self.toggle_rename_button = ttk.Button(self.control_frame, command=self.toggle_rename_frame); self.toggle_rename_button.pack(side=tk.LEFT, padx=5)
-        self.exit_button = ttk.Button(self.control_frame, command=self.root.destroy); self.exit_button.pack(side=tk.RIGHT, padx=5)
+        self.exit_button = ttk.Button(self.control_frame, command=self.on_exit); self.exit_button.pack(side=tk.RIGHT, padx=5)
         
         progress_frame = ttk.Frame(parent); progress_frame.grid(row=3, column=0, sticky="ew", padx=10, pady=5)
         progress_frame.columnconfigure(0, weight=1)
@@ -269,6 +459,7 @@ class AIPhotoDescriptor:
         ttk.Entry(self.rename_frame, textvariable=self.rename_dest_dir, width=80).grid(row=1, column=0, sticky=tk.EW, pady=2)
         self.browse_rename_button = ttk.Button(self.rename_frame, command=self.browse_rename_dest); self.browse_rename_button.grid(row=1, column=1, padx=5)
         self.start_rename_button = ttk.Button(self.rename_frame, command=self.start_renaming_process, style="Accent.TButton"); self.start_rename_button.grid(row=1, column=2)
+        self.hardlinks_check = ttk.Checkbutton(self.rename_frame, variable=self.use_hardlinks); self.hardlinks_check.grid(row=2, column=0, columnspan=3, sticky=tk.W, pady=2)
         self.rename_frame.grid_remove() # Hidden by default
         
         # --- Log and Image Panes ---
@@ -283,48 +474,77 @@ class AIPhotoDescriptor:
         self.copy_log_button = ttk.Button(log_button_frame, command=self.copy_log_to_clipboard); self.copy_log_button.pack()
 
     def update_ui_language(self, event=None):
-        self.lang = LANGUAGES[self.ui_language.get()]
-        self.version_label.config(text=self.lang['version'])
-        self.db_frame.config(text=self.lang['db_frame_title']); self.settings_frame.config(text=self.lang['settings_frame_title'])
-        self.process_frame.config(text=self.lang['process_frame_title']); self.interaction_frame.config(text=self.lang['interaction_frame_title'])
-        self.control_frame.config(text=self.lang['control_frame_title']); self.rename_frame.config(text=self.lang['rename_frame_title'])
-        self.log_container.config(text=self.lang['log_frame_title'])
-        self.db_path_label.config(text=self.lang['db_path_label']); self.llm_label.config(text=self.lang['llm_label'])
-        self.filename_language_label.config(text=self.lang['filename_language_label']); self.rename_dest_dir_label.config(text=self.lang['rename_dest_dir_label'])
-        self.browse_db_button.config(text=self.lang['browse_button']); self.process_button.config(text=self.lang['start_button'])
-        self.stop_button.config(text=self.lang['stop_button']); self.toggle_rename_button.config(text=self.lang['rename_button'])
-        self.exit_button.config(text=self.lang['exit_button']); self.copy_log_button.config(text=self.lang['copy_log_button'])
-        self.browse_rename_button.config(text=self.lang['browse_button']); self.start_rename_button.config(text=self.lang['start_rename_button'])
-        self.process_rb1.config(text=self.lang['process_mode_if_empty']); self.process_rb2.config(text=self.lang['process_mode_all'])
-        self.interact_rb1.config(text=self.lang['interaction_batch']); self.interact_rb2.config(text=self.lang['interaction_interactive'])
+        if self.ui_language.get() == self.applied_language: return # Re-selecting the current language changes nothing
+        self.applied_language = self.ui_language.get(); self.lang = LANGUAGES[self.applied_language]
+        for widget, key in self.i18n_widgets: widget.config(text=self.lang[key])
 
     def process_queue(self):
+        log_lines, progress, drained = [], None, False
         try:
             while True:
-                action, data = self.update_queue.get_nowait()
-                if action == 'log': self.log_text.insert(tk.END, f"[{datetime.now().strftime('%H:%M:%S')}] {data}\n"); self.log_text.see(tk.END)
-                elif action == 'progress':
-                    current, total = data; self.progress_bar['value'] = (current / total) * 100 if total > 0 else 0; self.progress_label.config(text=f"{current} / {total}")
-                elif action == 'show_edit_dialog': self.show_edit_dialog_main(data)
+                action, data = self.update_queue.get_nowait(); drained = True
+                if action == 'log': log_lines.append(f"[{datetime.now().strftime('%H:%M:%S')}] {data}\n"); continue
+                if action == 'progress': progress = data; continue # Only the latest value is shown
+                self.apply_queued_updates(log_lines, progress); log_lines, progress = [], None # Keep earlier log lines ahead of dialogs
+                if action == 'show_edit_dialog': self.show_edit_dialog_main(data)
                 elif action == 'show_interactive_dialog': self.show_interactive_dialog_main(data)
                 elif action == 'task_finished':
                     self.process_button.config(state=tk.NORMAL); self.toggle_rename_button.config(state=tk.NORMAL); self.stop_button.config(state=tk.DISABLED)
         except queue.Empty: pass
-        finally: self.root.after(100, self.process_queue)
+        finally: self.apply_queued_updates(log_lines, progress); self.root.after(QUEUE_POLL_BUSY_MS if drained else QUEUE_POLL_IDLE_MS, self.process_queue)
+
+    def apply_queued_updates(self, log_lines, progress):
+        """One Text insert and one scroll for all log lines drained in a tick, instead of a redraw per line."""
+        if log_lines:
+            self.log_text.insert(tk.END, ''.join(log_lines))
+            excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - LOG_MAX_LINES # Every line ends in '\n', so end-1c sits on an empty last line
+            if excess > 0: self.log_text.delete('1.0', f'{excess + 1}.0')
+            self.log_text.see(tk.END)
+        if progress:
+            current, total = progress; self.progress_bar['value'] = (current / total) * 100 if total > 0 else 0; self.progress_label.config(text=f"{current} / {total}")
 
     def browse_db(self):
         path = filedialog.askopenfilename(filetypes=[("SQLite Database", "*.db")])
-        if path: self.db_path.set(path); self.update_database_schema()
+        if not path: return
+        self.db_path.set(path)
+        if self.processing: return # The running batch keeps its DB; the new one is checked and used from the next start
+        self.db_file = path; self.update_database_schema()
+
+    @contextmanager
+    def db_connection(self):
+        """Shared long-lived connection to the selected DB, serialized across threads; commits on success like sqlite3.connect()."""
+        with self.db_lock:
+            if self.db_conn is None or self.db_conn_path != self.db_file: # First use, or another DB was selected
+                self.close_db_connection(); self.db_conn = sqlite3.connect(self.db_file, check_same_thread=False)
+                self.db_conn.executescript(SQLITE_PRAGMAS); self.db_conn_path = self.db_file
+            with self.db_conn: yield self.db_conn
+
+    def close_db_connection(self):
+        with self.db_lock:
+            if self.db_conn: self.db_conn.close(); self.db_conn, self.db_conn_path = None, None
 
     def update_database_schema(self):
-        if not self.db_path.get(): return
+        """Adds the AI columns if missing; each DB path is checked once per session. Returns False if the schema could not be updated."""
+        if not self.db_file: return False
+        if self.db_file in self.schema_checked_paths: return True
         try:
-            with sqlite3.connect(self.db_path.get()) as conn:
+            with self.db_connection() as conn:
                 cursor = conn.cursor(); cursor.execute("PRAGMA table_info(images)"); columns = [info[1] for info in cursor.fetchall()]
-                for col in ['ai_short_description', 'ai_long_description', 'ai_processed_date', 'ai_llm_used', 'ai_language']:
+                for col in ['ai_short_description', 'ai_long_description', 'ai_processed_date', 'ai_llm_used', 'ai_language', 'ai_content_hash']:
                     if col not in columns: cursor.execute(f'ALTER TABLE images ADD COLUMN {col} TEXT'); self.update_queue.put(('log', self.lang['db_schema_updated'].format(col=col)))
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_ai_content_hash ON images (ai_content_hash)')
+                # Partial indexes matching the processing and renaming queries, in path order; the full one serves "process all"
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_filepath ON images (filepath)')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_images_undescribed ON images (filepath) WHERE ai_short_description IS NULL OR ai_short_description = ''")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_images_described ON images (filepath) WHERE ai_short_description IS NOT NULL AND ai_short_description != ''")
                 conn.commit()
-        except sqlite3.Error as e: messagebox.showerror(self.lang['db_error'], self.lang['db_schema_update_failed'].format(e=e))
+            self.schema_checked_paths.add(self.db_file); return True
+        except sqlite3.Error as e: messagebox.showerror(self.lang['db_error'], self.lang['db_schema_update_failed'].format(e=e)); return False
+
+    def create_http_client(self, sdk, is_async=False):
+        """Pooled keep-alive HTTP client built from the SDK's own httpx subclass; None keeps the SDK default."""
+        if not httpx or not hasattr(sdk, 'DefaultHttpxClient'): return None
+        return (sdk.DefaultAsyncHttpxClient if is_async else sdk.DefaultHttpxClient)(limits=httpx.Limits(**HTTP_POOL_LIMITS), timeout=HTTP_TIMEOUT)
 
     def init_llm_clients(self):
         config = configparser.ConfigParser(); keys_file = "keys-ai.ini"; available_llms = []
@@ -333,10 +553,10 @@ class AIPhotoDescriptor:
         if 'Keys' in config:
             api_keys = config['Keys']
             if openai and 'OpenAI' in api_keys and api_keys.get('OpenAI'):
-                try: self.openai_client = openai.OpenAI(api_key=api_keys['OpenAI']); available_llms.append('OpenAI')
+                try: self.openai_client = openai.OpenAI(api_key=api_keys['OpenAI'], max_retries=LLM_MAX_RETRIES, http_client=self.create_http_client(openai)); available_llms.append('OpenAI')
                 except Exception as e: self.update_queue.put(('log', f"OpenAI client init error: {e}"))
             if anthropic and 'ANTHROPIC' in api_keys and api_keys.get('ANTHROPIC'):
-                try: self.anthropic_client = anthropic.Anthropic(api_key=api_keys['ANTHROPIC']); available_llms.append('Anthropic')
+                try: self.anthropic_client = anthropic.Anthropic(api_key=api_keys['ANTHROPIC'], max_retries=LLM_MAX_RETRIES, http_client=self.create_http_client(anthropic)); available_llms.append('Anthropic')
                 except Exception as e: self.update_queue.put(('log', f"Anthropic client init error: {e}"))
             if genai and 'GEMINI' in api_keys and api_keys.get('GEMINI'):
                 try: genai.configure(api_key=api_keys['GEMINI']); self.gemini_model = genai.GenerativeModel('gemini-1.5-flash'); available_llms.append('Gemini')
@@ -345,148 +565,232 @@ class AIPhotoDescriptor:
         if hasattr(self, 'llm_combo'): self.llm_combo['values'] = available_llms; self.selected_llm.set(available_llms[0]) if available_llms else None
 
     def start_processing(self):
-        if not self.db_path.get() or not os.path.exists(self.db_path.get()): messagebox.showwarning(self.lang['select_db_warning_title'], self.lang['select_db_warning_msg']); return
+        self.db_file = self.db_path.get()
+        if not self.db_file or not os.path.exists(self.db_file): messagebox.showwarning(self.lang['select_db_warning_title'], self.lang['select_db_warning_msg']); return
+        if not self.update_database_schema(): return # No-op unless the path was typed in rather than browsed
         self.process_button.config(state=tk.DISABLED); self.toggle_rename_button.config(state=tk.DISABLED); self.stop_button.config(state=tk.NORMAL)
         self.processing = True; self.update_queue.put(('log', self.lang['processing_started']))
-        threading.Thread(target=self.process_images_thread, daemon=True).start()
+        # LLM and language are read here, on the Tk thread, and passed down: worker threads don't read Tk variables mid-run
+        threading.Thread(target=self.process_images_thread, args=(self.selected_llm.get(), self.selected_filename_language.get()), daemon=True).start()
 
-    def stop_processing(self): self.update_queue.put(('log', self.lang['processing_stopped'])); self.processing = False
+    def stop_processing(self): self.update_queue.put(('log', self.lang['processing_stopped'])); self.processing = False # process_batch flushes the buffered writes
 
-    def process_images_thread(self):
+    def process_images_thread(self, llm, language):
         total = 0
         try:
-            mode = self.process_target_mode.get(); query = 'SELECT id, filepath FROM images ORDER BY filepath'
-            if mode == 'if_empty': query = 'SELECT id, filepath FROM images WHERE (ai_short_description IS NULL OR ai_short_description = "") ORDER BY filepath'
-            with sqlite3.connect(self.db_path.get()) as conn: images_to_process = conn.cursor().execute(query).fetchall()
+            # Existing descriptions come with the list, so interactive mode needs no lookup per image
+            mode = self.process_target_mode.get(); query = 'SELECT id, filepath, ai_short_description, ai_long_description FROM images ORDER BY filepath'
+            if mode == 'if_empty': query = "SELECT id, filepath, ai_short_description, ai_long_description FROM images WHERE ai_short_description IS NULL OR ai_short_description = '' ORDER BY filepath"
+            with self.db_connection() as conn: images_to_process = conn.cursor().execute(query).fetchall()
             total = len(images_to_process)
             self.update_queue.put(('progress', (0, total))); self.update_queue.put(('log', self.lang['found_for_processing'].format(total=total)))
-            for i, (image_id, image_path) in enumerate(images_to_process):
-                if not self.processing: self.update_queue.put(('log', self.lang['processing_interrupted'])); break
-                self.update_queue.put(('progress', (i, total))) # Progress before processing
-                if not os.path.exists(image_path): self.update_queue.put(('log', self.lang['file_not_found_skip'].format(path=image_path))); continue
-                
-                short_d, long_d = self.get_existing_description(image_id)
-                final_desc_dict = None
-                
-                if self.interaction_mode.get() == 'interactive':
-                    if short_d and mode == 'all': # Interactive, has description, and processing all
-                        dialog_event = threading.Event(); dialog_res = {}
-                        self.update_queue.put(('show_interactive_dialog', (image_path, short_d, long_d, dialog_event, dialog_res)))
-                        dialog_event.wait(); result = dialog_res.get('result')
-                        if not result: continue # User skipped this image
-                        if result['status'] == 'cancel_all': break
-                        if result['status'] == 'save': final_desc_dict = result.get('data')
-                        if result['status'] == 'reprocess': pass # Fall through
-                    
-                    if not short_d or (locals().get('result') and result['status'] == 'reprocess'): # No description OR user requested reprocess
-                        persons = self.get_persons_for_image(image_id); dogs = self.get_dogs_for_image(image_id)
-                        new_data = self.generate_description(image_path, persons, dogs)
-                        if new_data:
-                            dialog_event = threading.Event(); dialog_res = {}
-                            self.update_queue.put(('show_edit_dialog', (image_path, new_data['short'], new_data['long'], dialog_event, dialog_res)))
-                            dialog_event.wait(); edit_result = dialog_res.get('result')
-                            if edit_result: final_desc_dict = edit_result.get('data')
-                else: # Batch mode
-                    persons = self.get_persons_for_image(image_id); dogs = self.get_dogs_for_image(image_id)
-                    final_desc_dict = self.generate_description(image_path, persons, dogs)
-
-                if final_desc_dict:
-                    with sqlite3.connect(self.db_path.get()) as conn:
-                        conn.cursor().execute("UPDATE images SET ai_short_description=?, ai_long_description=?, ai_processed_date=?, ai_llm_used=?, ai_language=? WHERE id=?",
-                            (final_desc_dict['short'], final_desc_dict['long'], datetime.now().isoformat(), self.selected_llm.get(), self.selected_filename_language.get(), image_id))
-                    self.update_queue.put(('log', self.lang['saving_description_for'].format(filename=os.path.basename(image_path))))
-                elif locals().get('result') is None and self.interaction_mode.get() == 'interactive':
-                    self.update_queue.put(('log', self.lang['processing_cancelled_for'].format(filename=os.path.basename(image_path))))
-            
+            persons, dogs = self.preload_persons_and_dogs([row[0] for row in images_to_process])
+            if self.interaction_mode.get() == 'batch': self.process_batch(images_to_process, mode, persons, dogs, llm, language)
+            else: self.process_interactive(images_to_process, mode, persons, dogs, llm, language)
             if self.processing: self.update_queue.put(('log', self.lang['processing_finished']))
         except Exception as e: self.update_queue.put(('log', self.lang['critical_error_thread'].format(e=e, traceback=traceback.format_exc())))
         finally:
             self.update_queue.put(('progress', (total, total))) # Final progress update
+            encode_image_base64.cache_clear() # Payloads are only reused within a run; don't keep them alive between runs
             self.processing = False; self.update_queue.put(('task_finished', None))
 
-    def show_edit_dialog_main(self, data):
-        image_path, short, long, event, res_dict = data
-        dialog = EditDescriptionDialog(self.root, self, image_path, short, long); self.root.wait_window(dialog); res_dict['result'] = dialog.result; event.set()
-    def show_interactive_dialog_main(self, data):
-        image_path, short, long, event, res_dict = data
-        dialog = InteractiveDialog(self.root, self, image_path, short, long); self.root.wait_window(dialog); res_dict['result'] = dialog.result; event.set()
-
-    def get_persons_for_image(self, image_id):
-        with sqlite3.connect(self.db_path.get()) as conn: return [row[0] for row in conn.cursor().execute("SELECT DISTINCT p.short_name FROM persons p JOIN person_detections pd ON p.id = pd.person_id WHERE pd.image_id = ? AND p.is_known = 1", (image_id,)).fetchall()]
-    def get_dogs_for_image(self, image_id):
-        with sqlite3.connect(self.db_path.get()) as conn: return [row[0] for row in conn.cursor().execute("SELECT DISTINCT d.name FROM dogs d JOIN dog_detections dd ON d.id = dd.dog_id WHERE dd.image_id = ? AND d.is_known = 1", (image_id,)).fetchall()]
-    def get_existing_description(self, image_id):
-        with sqlite3.connect(self.db_path.get()) as conn: return conn.cursor().execute("SELECT ai_short_description, ai_long_description FROM images WHERE id = ?", (image_id,)).fetchone() or (None, None)
-
-    def get_language_specific_prompt(self, person_names, dog_names):
-        lang_code = 'ru' if self.selected_filename_language.get() == 'Русский' else 'en'
-        if lang_code == "ru":
-            base_prompt = ("Проанализируй это изображение и предоставь описания на русском языке.\n\n"
-                           "Ты ДОЛЖЕН ответить ТОЛЬКО JSON объектом со структурой:\n"
-                           "{\"short\": \"краткое описание на русском\", \"long\": \"подробное описание изображения на русском\"}\n\n"
-                           "Правила для краткого описания:\n- Краткое описание сцены на русском языке.\n- Используй пробелы между словами (НЕ подчеркивания).\n"
-                           "- Максимум 100 символов.\n- На правильном русском языке.\n- Это описание будет использовано как имя файла, поэтому оно должно быть лаконичным и информативным.\n\n"
-                           "Дополнительно, если на фото изображено известное место или произведение искусства, постарайся указать его название. "
-                           "Для произведений искусства, если возможно, укажи автора и место хранения (музей). "
-                           "Эту информацию кратко отрази в коротком описании и более подробно в длинном.")
-        else: # English
-            base_prompt = ("Analyze this image and provide descriptions in English.\n\n"
-                           "You MUST respond with ONLY a JSON object with the structure:\n"
-                           "{\"short\": \"short description in English\", \"long\": \"detailed description of the image in English\"}\n\n"
-                           "Rules for the short description:\n- Brief description of the scene in English.\n- Use spaces between words (NOT underscores).\n"
-                           "- Maximum 100 characters.\n- In proper English.\n- This description will be used as a filename, so it should be concise and informative.\n\n"
-                           "Additionally, if the photo depicts a famous place or a work of art, try to identify it. "
-                           "For artwork, if possible, specify the artist and its location (museum). "
-                           "Briefly include this information in the short description and provide more detail in the long one.")
-        if person_names:
-            names_str = ", ".join(person_names); base_prompt += f"\n\nЛюди на этом изображении: {names_str}\nВАЖНО: Включи эти имена в свои описания." if lang_code == "ru" else f"\n\nPeople in this image: {names_str}\nIMPORTANT: Include these names in your descriptions."
-        if dog_names:
-            dogs_str = ", ".join(dog_names); base_prompt += f"\n\nСобаки на этом изображении: {dogs_str}\nВАЖНО: Включи эти клички собак в свои описания." if lang_code == "ru" else f"\n\nDogs in this image: {dogs_str}\nIMPORTANT: Include these dog names in your descriptions."
-        return base_prompt
+    def process_interactive(self, images_to_process, mode, persons, dogs, llm, language):
+        """The payload of the next image still lacking a description is encoded in the background while the current one is handled."""
+        total = len(images_to_process); prefetch = None
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            for i, (image_id, image_path, short_d, long_d) in enumerate(images_to_process):
+                if not self.processing: self.update_queue.put(('log', self.lang['processing_interrupted'])); break
+                if prefetch: prefetch.result(); prefetch = None # The payload cache isn't locked: let the encode finish rather than encode twice
+                if i + 1 < total and not images_to_process[i + 1][2]: prefetch = prefetcher.submit(get_image_base64, images_to_process[i + 1][1])
+                self.update_queue.put(('progress', (i, total))) # Progress before processing
+                if not os.path.exists(image_path): self.update_queue.put(('log', self.lang['file_not_found_skip'].format(path=image_path))); continue
+
+                final_desc_dict = None; result = None
+
+                if short_d and mode == 'all': # Has description and processing all
+                    dialog_result = Future(); self.update_queue.put(('show_interactive_dialog', (image_path, short_d, long_d, dialog_result)))
+                    result = dialog_result.result()
+                    if not result: continue # User skipped this image
+                    if result['status'] == 'cancel_all': break
+                    if result['status'] == 'save': final_desc_dict = result.get('data')
+                    if result['status'] == 'reprocess': pass # Fall through
+
+                if not short_d or (result and result['status'] == 'reprocess'): # No description OR user requested reprocess
+                    new_data = self.generate_description(image_path, persons.get(image_id, []), dogs.get(image_id, []), llm, language)
+                    if new_data:
+                        dialog_result = Future(); self.update_queue.put(('show_edit_dialog', (image_path, new_data['short'], new_data['long'], dialog_result)))
+                        edit_result = dialog_result.result()
+                        if edit_result: final_desc_dict = edit_result.get('data')
+
+                if final_desc_dict: self.save_description(image_id, image_path, final_desc_dict, llm, language)
+                elif result is None: self.update_queue.put(('log', self.lang['processing_cancelled_for'].format(filename=os.path.basename(image_path))))
+
+    def process_batch(self, images_to_process, mode, persons, dogs, llm, language):
+        """Batch mode: keeps up to the configured number of requests in flight on a private event loop.
+        When only empty descriptions are filled in, byte-identical images already described are served from the DB."""
+        try: asyncio.run(self.process_batch_async(images_to_process, persons, dogs, llm, language, reuse_cached=(mode == 'if_empty')))
+        finally: self.flush_pending_writes()
+        if not self.processing: self.update_queue.put(('log', self.lang['processing_interrupted']))
+
+    async def process_batch_async(self, images_to_process, persons, dogs, llm, language, reuse_cached=False):
+        async_client = self.create_async_llm_client(llm); total = len(images_to_process); done = 0
+        # 2 x concurrency workers share one row iterator: images are encoded on a dedicated CPU-sized pool up to `concurrency`
+        # images ahead of the requests in flight, and only that many tasks exist however large the library is
+        concurrency = self.llm_concurrency.get(); request_slots = asyncio.Semaphore(concurrency); rows = iter(images_to_process)
+        async def worker(encode_pool):
+            nonlocal done
+            for image_id, image_path, _, _ in rows:
+                if not self.processing: return
+                try: await self.process_image_async(image_id, image_path, persons.get(image_id, []), dogs.get(image_id, []), llm, language, async_client, encode_pool, request_slots, reuse_cached)
+                except Exception as e: self.update_queue.put(('log', self.lang['image_processing_error'].format(filename=os.path.basename(image_path), e=e)))
+                finally: done += 1; self.update_queue.put(('progress', (done, total)))
+        try:
+            # Blocking SDK calls (Gemini, sync fallbacks) go through asyncio.to_thread, i.e. the default executor, which is capped at
+            # cpu_count + 4 threads; a pool sized to the setting lets them reach the configured concurrency too
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as encode_pool, ThreadPoolExecutor(max_workers=concurrency) as request_pool:
+                asyncio.get_running_loop().set_default_executor(request_pool)
+                await asyncio.gather(*(worker(encode_pool) for _ in range(min(2 * concurrency, total))))
+        finally:
+            if async_client: await async_client.close()
+
+    async def process_image_async(self, image_id, image_path, persons, dogs, llm, language, async_client, encode_pool, request_slots, reuse_cached=False):
+        """reuse_cached: a description stored for an identical image with this LLM and language is reused."""
+        if not os.path.exists(image_path): self.update_queue.put(('log', self.lang['file_not_found_skip'].format(path=image_path))); return
+        loop = asyncio.get_running_loop(); content_hash = await loop.run_in_executor(encode_pool, file_content_hash, image_path)
+        if reuse_cached and content_hash:
+            cached = await loop.run_in_executor(encode_pool, self.find_cached_description, content_hash, llm, language)
+            if cached:
+                self.update_queue.put(('log', self.lang['reused_description_for'].format(filename=os.path.basename(image_path))))
+                self.save_description(image_id, image_path, cached, llm, language, batch=True, content_hash=content_hash); return
+        image_payload = await loop.run_in_executor(encode_pool, get_image_base64, image_path)
+        async with request_slots:
+            if not self.processing: return
+            final_desc_dict = await self.generate_description_async(image_path, image_payload, persons, dogs, llm, language, async_client)
+        if final_desc_dict: self.save_description(image_id, image_path, final_desc_dict, llm, language, batch=True, content_hash=content_hash)
+
+    def find_cached_description(self, content_hash, llm, language):
+        with self.db_connection() as conn: row = conn.execute(CACHED_DESCRIPTION_SQL, (content_hash, llm, language)).fetchone()
+        return {'short': row[0], 'long': row[1]} if row else None
+
+    def save_description(self, image_id, image_path, desc, llm, language, batch=False, content_hash=None):
+        """Interactive saves are committed immediately; batch saves are buffered and committed DB_WRITE_BATCH_SIZE at a time."""
+        if content_hash is None: content_hash = file_content_hash(image_path)
+        row = (desc['short'], desc['long'], datetime.now().isoformat(), llm, language, content_hash, image_id)
+        with self.db_lock:
+            self.pending_writes.append(row)
+            if not batch or len(self.pending_writes) >= DB_WRITE_BATCH_SIZE: self.flush_pending_writes()
+        self.update_queue.put(('log', self.lang['saving_description_for'].format(filename=os.path.basename(image_path))))
+
+    def flush_pending_writes(self):
+        with self.db_lock:
+            if not self.pending_writes: return
+            with self.db_connection() as conn: conn.executemany(SAVE_DESCRIPTION_SQL, self.pending_writes)
+            self.pending_writes.clear()
+
+    def show_edit_dialog_main(self, data): self.run_dialog(EditDescriptionDialog, *data)
+    def show_interactive_dialog_main(self, data): self.run_dialog(InteractiveDialog, *data)
+    def run_dialog(self, dialog_class, image_path, short, long, result_future):
+        """Runs a modal dialog on the Tk thread and resolves the future the worker thread is blocked on, also if the dialog fails to open."""
+        try: dialog = dialog_class(self.root, self, image_path, short, long); self.root.wait_window(dialog); result_future.set_result(dialog.result)
+        except Exception as e: result_future.set_exception(e)
+
+    def preload_persons_and_dogs(self, image_ids):
+        """Known person and dog names for every image of a run, fetched in chunked IN (...) queries instead of two queries per image."""
+        persons, dogs = defaultdict(list), defaultdict(list)
+        with self.db_connection() as conn:
+            for start in range(0, len(image_ids), SQL_IN_CHUNK_SIZE):
+                chunk = image_ids[start:start + SQL_IN_CHUNK_SIZE]; placeholders = ','.join('?' * len(chunk))
+                for image_id, name in conn.execute(f"SELECT DISTINCT pd.image_id, p.short_name FROM persons p JOIN person_detections pd ON p.id = pd.person_id WHERE pd.image_id IN ({placeholders}) AND p.is_known = 1", chunk): persons[image_id].append(name)
+                for image_id, name in conn.execute(f"SELECT DISTINCT dd.image_id, d.name FROM dogs d JOIN dog_detections dd ON d.id = dd.dog_id WHERE dd.image_id IN ({placeholders}) AND d.is_known = 1", chunk): dogs[image_id].append(name)
+        return persons, dogs
+
+    def get_language_specific_prompt(self, person_names, dog_names, language):
+        return build_prompt('ru' if language == 'Русский' else 'en', tuple(person_names), tuple(dog_names))
 
     def parse_llm_response(self, response_text):
-        try: return json.loads(response_text)
+        try: return json_loads(response_text)
         except json.JSONDecodeError:
-            match = re.search(r'```json\s*([\s\S]+?)\s*```', response_text)
-            if match:
-                try: return json.loads(match.group(1))
+            start, end = response_text.find('{'), response_text.rfind('}') # The object inside ```json fences or surrounding prose
+            if 0 <= start < end:
+                try: return json_loads(response_text[start:end + 1])
                 except json.JSONDecodeError: pass
             try:
-                short = re.search(r'["\']short["\']\s*:\s*["\'](.*?)["\']', response_text, re.DOTALL).group(1)
-                long = re.search(r'["\']long["\']\s*:\s*["\'](.*?)["\']', response_text, re.DOTALL).group(1)
+                short = SHORT_FIELD_RE.search(response_text).group(1)
+                long = LONG_FIELD_RE.search(response_text).group(1)
                 return {'short': short, 'long': long}
             except AttributeError: return None
 
-    def generate_description_openai(self, base64_image, prompt):
-        response = self.openai_client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": [{"type": "text", "text": prompt}, {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}]}], max_tokens=1000, response_format={"type": "json_object"})
-        return self.parse_llm_response(response.choices[0].message.content)
-    def generate_description_anthropic(self, base64_image, prompt):
-        response = self.anthropic_client.messages.create(model="claude-3-haiku-20240307", max_tokens=1000, messages=[{"role": "user", "content": [{"type": "image", "source": {"type": "base64", "media_type": "image/jpeg", "data": base64_image}}, {"type": "text", "text": prompt}]}])
-        return self.parse_llm_response(response.content[0].text)
-    def generate_description_gemini(self, pil_image, prompt):
-        response = self.gemini_model.generate_content([prompt, pil_image]); return self.parse_llm_response(response.text)
-
-    def generate_description(self, image_path, persons, dogs):
-        base64_image = get_image_base64(image_path)
-        if not base64_image: self.update_queue.put(('log', self.lang['image_encode_failed'].format(filename=os.path.basename(image_path)))); return None
-        prompt = self.get_language_specific_prompt(persons, dogs); llm = self.selected_llm.get()
+    def openai_request(self, image_payload, prompt):
+        media_type, data = image_payload # OpenAI takes the image as a data: URL
+        return dict(model="gpt-4o", messages=[{"role": "user", "content": [{"type": "text", "text": prompt}, {"type": "image_url", "image_url": {"url": f"data:{media_type};base64,{data}"}}]}], max_tokens=1000, response_format={"type": "json_object"})
+    def anthropic_request(self, image_payload, prompt):
+        media_type, data = image_payload # Anthropic takes the bare base64 string plus its media type
+        return dict(model="claude-3-haiku-20240307", max_tokens=1000, messages=[{"role": "user", "content": [{"type": "image", "source": {"type": "base64", "media_type": media_type, "data": data}}, {"type": "text", "text": prompt}]}])
+    def gemini_request(self, image_payload, prompt):
+        media_type, data = image_payload # Gemini takes raw bytes as an inline blob, so no PIL image is decoded and re-encoded by the SDK
+        return [prompt, {'mime_type': media_type, 'data': b64decode(data)}]
+
+    def generate_description_openai(self, image_payload, prompt):
+        response = self.openai_client.chat.completions.create(**self.openai_request(image_payload, prompt)); return self.parse_llm_response(response.choices[0].message.content)
+    def generate_description_anthropic(self, image_payload, prompt):
+        response = self.anthropic_client.messages.create(**self.anthropic_request(image_payload, prompt)); return self.parse_llm_response(response.content[0].text)
+    def generate_description_gemini(self, image_payload, prompt):
+        response = self.gemini_model.generate_content(self.gemini_request(image_payload, prompt), request_options={'retry': GEMINI_RETRY}); return self.parse_llm_response(response.text)
+
+    async def generate_description_openai_async(self, client, image_payload, prompt):
+        response = await client.chat.completions.create(**self.openai_request(image_payload, prompt)); return self.parse_llm_response(response.choices[0].message.content)
+    async def generate_description_anthropic_async(self, client, image_payload, prompt):
+        response = await client.messages.create(**self.anthropic_request(image_payload, prompt)); return self.parse_llm_response(response.content[0].text)
+
+    def create_async_llm_client(self, llm):
+        """Returns an async SDK client sharing the sync client's key, or None to fall back to the sync client in a worker thread.
+        The client owns a fresh pooled httpx.AsyncClient, since async connections are bound to the event loop of one batch run."""
+        if llm == "OpenAI" and self.openai_client and hasattr(openai, 'AsyncOpenAI'): return openai.AsyncOpenAI(api_key=self.openai_client.api_key, max_retries=LLM_MAX_RETRIES, http_client=self.create_http_client(openai, is_async=True))
+        if llm == "Anthropic" and self.anthropic_client and hasattr(anthropic, 'AsyncAnthropic'): return anthropic.AsyncAnthropic(api_key=self.anthropic_client.api_key, max_retries=LLM_MAX_RETRIES, http_client=self.create_http_client(anthropic, is_async=True))
+        return None
+
+    def is_llm_client_ready(self, llm):
         if (llm == "OpenAI" and not self.openai_client) or (llm == "Anthropic" and not self.anthropic_client) or (llm == "Gemini" and not self.gemini_model):
-            self.update_queue.put(('log', self.lang['client_not_initialized'].format(llm=llm))); return None
+            self.update_queue.put(('log', self.lang['client_not_initialized'].format(llm=llm))); return False
+        return True
+
+    async def generate_description_async(self, image_path, image_payload, persons, dogs, llm, language, async_client):
+        if not image_payload: self.update_queue.put(('log', self.lang['image_encode_failed'].format(filename=os.path.basename(image_path)))); return None
+        prompt = self.get_language_specific_prompt(persons, dogs, language)
+        if not self.is_llm_client_ready(llm): return None
         try:
             self.update_queue.put(('log', self.lang['sending_request_to'].format(llm=llm, filename=os.path.basename(image_path))))
-            if llm == "OpenAI": return self.generate_description_openai(base64_image, prompt)
-            elif llm == "Anthropic": return self.generate_description_anthropic(base64_image, prompt)
-            elif llm == "Gemini":
-                with Image.open(image_path) as img: return self.generate_description_gemini(img, prompt)
+            if llm == "OpenAI":
+                if async_client: return await self.generate_description_openai_async(async_client, image_payload, prompt)
+                return await asyncio.to_thread(self.generate_description_openai, image_payload, prompt)
+            elif llm == "Anthropic":
+                if async_client: return await self.generate_description_anthropic_async(async_client, image_payload, prompt)
+                return await asyncio.to_thread(self.generate_description_anthropic, image_payload, prompt)
+            elif llm == "Gemini": return await asyncio.to_thread(self.generate_description_gemini, image_payload, prompt)
+        except Exception as e: self.update_queue.put(('log', self.lang['api_error'].format(llm=llm, e=e))); return None
+
+    def generate_description(self, image_path, persons, dogs, llm, language):
+        image_payload = get_image_base64(image_path)
+        if not image_payload: self.update_queue.put(('log', self.lang['image_encode_failed'].format(filename=os.path.basename(image_path)))); return None
+        prompt = self.get_language_specific_prompt(persons, dogs, language)
+        if not self.is_llm_client_ready(llm): return None
+        try:
+            self.update_queue.put(('log', self.lang['sending_request_to'].format(llm=llm, filename=os.path.basename(image_path))))
+            if llm == "OpenAI": return self.generate_description_openai(image_payload, prompt)
+            elif llm == "Anthropic": return self.generate_description_anthropic(image_payload, prompt)
+            elif llm == "Gemini": return self.generate_description_gemini(image_payload, prompt)
         except Exception as e: self.update_queue.put(('log', self.lang['api_error'].format(llm=llm, e=e))); return None
 
     def toggle_rename_frame(self):
-        if not self.db_path.get() or not os.path.exists(self.db_path.get()): messagebox.showwarning(self.lang['select_db_warning_title'], self.lang['select_db_warning_msg']); return
+        self.db_file = self.db_path.get()
+        if not self.db_file or not os.path.exists(self.db_file): messagebox.showwarning(self.lang['select_db_warning_title'], self.lang['select_db_warning_msg']); return
+        if not self.update_database_schema(): return
         if self.rename_frame.winfo_viewable(): self.rename_frame.grid_remove()
         else: self.rename_frame.grid(); self.propose_rename_directory(self.rename_dest_dir)
             
     def propose_rename_directory(self, dest_dir_var):
-        """Proposes a 'NewNames' subdirectory in the current working directory."""
+        """Proposes a 'NewNames' subdirectory in the current working directory, unless a directory was already chosen."""
+        if dest_dir_var.get(): return
         try:
             # Получаем текущую рабочую директорию
             current_dir = os.getcwd()
@@ -506,32 +810,57 @@ class AIPhotoDescriptor:
     def start_renaming_process(self):
         dest_dir = self.rename_dest_dir.get()
         if not dest_dir: messagebox.showwarning(self.lang['select_db_warning_title'], self.lang['select_rename_dir_warning_msg']); return
-        if not os.path.exists(dest_dir):
-            try: os.makedirs(dest_dir)
-            except OSError as e: messagebox.showerror(self.lang['dir_creation_error_title'], self.lang['dir_creation_error_msg'].format(e=e)); return
+        self.db_file = self.db_path.get()
+        if not self.update_database_schema(): return # No-op unless the path was edited after the rename frame was opened
+        try: os.makedirs(dest_dir, exist_ok=True)
+        except OSError as e: messagebox.showerror(self.lang['dir_creation_error_title'], self.lang['dir_creation_error_msg'].format(e=e)); return
         self.process_button.config(state=tk.DISABLED); self.toggle_rename_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.DISABLED) # No stop for renaming for now
-        self.update_queue.put(('log', self.lang['renaming_started'])); threading.Thread(target=self.renaming_thread, args=(dest_dir,), daemon=True).start()
+        self.update_queue.put(('log', self.lang['renaming_started'])); threading.Thread(target=self.renaming_thread, args=(dest_dir, self.use_hardlinks.get()), daemon=True).start()
 
-    def renaming_thread(self, dest_dir):
+    def renaming_thread(self, dest_dir, use_hardlinks=False):
         total = 0
         try:
-            with sqlite3.connect(self.db_path.get()) as conn: images_to_rename = conn.cursor().execute('SELECT filepath, ai_short_description FROM images WHERE ai_short_description IS NOT NULL AND ai_short_description != ""').fetchall()
+            with self.db_connection() as conn: images_to_rename = conn.cursor().execute('SELECT filepath, ai_short_description FROM images WHERE ai_short_description IS NOT NULL AND ai_short_description != "" ORDER BY filepath').fetchall()
             total = len(images_to_rename)
             self.update_queue.put(('progress', (0, total))); self.update_queue.put(('log', self.lang['found_for_renaming'].format(total=total)))
-            for i, (original_path, description) in enumerate(images_to_rename):
-                self.update_queue.put(('progress', (i, total)))
-                if not os.path.exists(original_path): self.update_queue.put(('log', self.lang['file_not_found_skip'].format(path=original_path))); continue
-                file_extension = Path(original_path).suffix; new_filename_base = sanitize_filename(description)
-                new_filename = f"{new_filename_base}{file_extension}"; new_filepath = os.path.join(dest_dir, new_filename)
-                counter = 2
-                while os.path.exists(new_filepath): new_filename = f"{new_filename_base}_({counter}){file_extension}"; new_filepath = os.path.join(dest_dir, new_filename); counter += 1
-                try: shutil.copy2(original_path, new_filepath); self.update_queue.put(('log', self.lang['copied_file'].format(original=os.path.basename(original_path), new=new_filename)))
-                except Exception as e: self.update_queue.put(('log', self.lang['copy_error'].format(original=os.path.basename(original_path), e=e)))
+            # Target names are chosen up front against one listing of dest_dir, so concurrent copies never race for the same name
+            # and collisions cost no stat() calls; names are compared casefolded, as on Windows/macOS filesystems
+            planned, taken = [], {entry.name.casefold() for entry in os.scandir(dest_dir)}
+            for original_path, description in images_to_rename:
+                file_extension = file_suffix(original_path); new_filename_base = sanitize_filename(description)
+                new_filename = f"{new_filename_base}{file_extension}"; counter = 2
+                while new_filename.casefold() in taken: new_filename = f"{new_filename_base}_({counter}){file_extension}"; counter += 1
+                taken.add(new_filename.casefold()); planned.append((original_path, new_filename, os.path.join(dest_dir, new_filename)))
+            done, progress_step = 0, max(1, total // RENAME_PROGRESS_STEPS)
+            with ThreadPoolExecutor(max_workers=RENAME_COPY_WORKERS) as copy_pool:
+                for future in as_completed([copy_pool.submit(self.copy_renamed_file, *item, use_hardlinks) for item in planned]):
+                    done += 1
+                    if done % progress_step == 0: self.update_queue.put(('progress', (done, total))) # The final (total, total) is always sent below
             self.update_queue.put(('log', self.lang['renaming_finished']))
         except Exception as e: self.update_queue.put(('log', self.lang['critical_error_renaming_thread'].format(e=e, traceback=traceback.format_exc())))
         finally: self.update_queue.put(('progress', (total, total))); self.update_queue.put(('task_finished', None))
 
+    def copy_renamed_file(self, original_path, new_filename, new_filepath, use_hardlinks):
+        try:
+            if use_hardlinks: linked = link_or_copy(original_path, new_filepath)
+            else: copy_file_fast(original_path, new_filepath); linked = False
+            self.update_queue.put(('log', self.lang['linked_file' if linked else 'copied_file'].format(original=os.path.basename(original_path), new=new_filename)))
+        except Exception as e:
+            if isinstance(e, FileNotFoundError) and e.filename == original_path: self.update_queue.put(('log', self.lang['file_not_found_skip'].format(path=original_path))) # Sources are not stat()ed up front
+            else: self.update_queue.put(('log', self.lang['copy_error'].format(original=os.path.basename(original_path), e=e)))
+
+    def on_exit(self):
+        try:
+            for client in (self.openai_client, self.anthropic_client):
+                if client: client.close() # Releases the pooled keep-alive connections
+            if self.db_lock.acquire(timeout=EXIT_DB_LOCK_TIMEOUT): # A worker stuck on a locked DB must not keep the window open
+                try: self.flush_pending_writes(); self.close_db_connection()
+                finally: self.db_lock.release()
+            else: print("Database still busy, closing without writing the pending descriptions")
+        except Exception as e: print(f"Error while closing: {e}") # e.g. DB locked by another tool; the window must close regardless
+        finally: self.root.destroy()
+
     def copy_log_to_clipboard(self): self.root.clipboard_clear(); self.root.clipboard_append(self.log_text.get(1.0, tk.END)); self.update_queue.put(('log', self.lang['log_copied']))
 
 def main():